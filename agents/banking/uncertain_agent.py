@@ -51,7 +51,8 @@ Be friendly, professional, and guide users toward getting the help they need."""
         model: str,
         conversation_history: List[Dict[str, str]] = None,
         debug_callback: callable = None,
-        data_service: Optional[Any] = None
+        data_service: Optional[Any] = None,
+        plan: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """Process unclear queries by asking for clarification"""
         
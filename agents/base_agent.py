@@ -38,7 +38,8 @@ class BaseAgent(ABC):
         model: str,
         conversation_history: List[Dict[str, str]] = None,
         debug_callback: callable = None,
-        data_service: Optional[DataInterface] = None
+        data_service: Optional[DataInterface] = None,
+        plan: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
         Process the query using plan-based execution.
@@ -48,6 +49,7 @@ class BaseAgent(ABC):
             llm_service: LLM service to use
             model: Model to use
             conversation_history: Previous messages in the conversation
+            plan: Plan already created for this query with create_plan; skips planning
             
         Returns:
             Dictionary containing:
@@ -70,8 +72,9 @@ class BaseAgent(ABC):
             # Initialize tools for this execution
             self._initialize_tools(llm_service, model)
             
-            # Create execution plan
-            plan = self.create_plan(query, llm_service, model, conversation_history)
+            # Create execution plan, unless the caller already has one
+            if plan is None:
+                plan = self.create_plan(query, llm_service, model, conversation_history)
             if debug_callback:
                 if isinstance(plan, dict):
                     debug_callback(f"Plan created with {len(plan.get('steps', []))} steps")
@@ -1,6 +1,6 @@
 from typing import Dict, Any, Optional
 from agents.tools.base_tool import BaseTool
-from services.data_interface import DataInterface
+from services.data_interface import DataInterface, MATERIALIZED_VIEWS
 import pandas as pd
 
 
@@ -47,13 +47,19 @@ class CheckViewDataTool(BaseTool):
             }
         
         try:
+            # Level-3 views are read from their snapshot table once it has been refreshed
+            source = view_name
+            snapshot = MATERIALIZED_VIEWS.get(view_name.lower())
+            if snapshot and snapshot in {table.lower() for table in self.data_service.get_available_tables()}:
+                source = snapshot
+            
             # Get total row count
-            count_query = f"SELECT COUNT(*) as total_count FROM {view_name}"
+            count_query = f"SELECT COUNT(*) as total_count FROM {source}"
             count_df = self.data_service.execute_query(count_query)
             total_count = count_df.iloc[0]['total_count'] if not count_df.empty else 0
             
             # Get sample data
-            sample_query = f"SELECT * FROM {view_name} LIMIT {limit}"
+            sample_query = f"SELECT * FROM {source} LIMIT {limit}"
             sample_df = self.data_service.execute_query(sample_query)
             
             # Get column information
@@ -110,6 +116,7 @@ class CheckViewDataTool(BaseTool):
             
             result = {
                 "view_name": view_name,
+                "source": source,
                 "total_rows": total_count,
                 "sample_size": len(sample_df),
                 "columns": columns_info,
@@ -87,25 +87,26 @@ class CustomerQueryTool(BaseTool):
         """Query customer segmentation data"""
         sql = """
             SELECT 
-                segment,
+                c.segment,
                 COUNT(*) as customer_count,
-                AVG(credit_score) as avg_credit_score,
-                AVG(annual_income) as avg_annual_income,
-                AVG(total_relationship_value) as avg_relationship_value,
-                SUM(products_count) as total_products,
-                AVG(products_count) as avg_products_per_customer
-            FROM customers
-            WHERE status = 'active'
+                AVG(c.credit_score) as avg_credit_score,
+                AVG(c.annual_income) as avg_annual_income,
+                AVG(cs.total_relationship_value) as avg_relationship_value,
+                SUM(cs.products_count) as total_products,
+                AVG(cs.products_count) as avg_products_per_customer
+            FROM customers c
+            LEFT JOIN v_customer_summary cs ON c.customer_id = cs.customer_id
+            WHERE c.status = 'active'
         """
         
         # Add filters
         if filters:
             if 'segment' in filters:
-                sql += f" AND segment = :segment"
+                sql += f" AND c.segment = :segment"
             if 'min_credit_score' in filters:
-                sql += f" AND credit_score >= :min_credit_score"
+                sql += f" AND c.credit_score >= :min_credit_score"
         
-        sql += " GROUP BY segment ORDER BY customer_count DESC"
+        sql += " GROUP BY c.segment ORDER BY customer_count DESC"
         
         df = self.data_service.execute_query(sql, filters)
         
@@ -115,9 +116,10 @@ class CustomerQueryTool(BaseTool):
         
         for segment in segments[:3]:  # Top 3 segments
             sample_sql = """
-                SELECT customer_id, name, credit_score, annual_income, products_count
-                FROM customers 
-                WHERE segment = :segment AND status = 'active'
+                SELECT c.customer_id, c.name, c.credit_score, c.annual_income, cs.products_count
+                FROM customers c
+                LEFT JOIN v_customer_summary cs ON c.customer_id = cs.customer_id
+                WHERE c.segment = :segment AND c.status = 'active'
                 LIMIT 5
             """
             samples = self.data_service.execute_query(sample_sql, {'segment': segment})
@@ -364,7 +366,9 @@ class CustomerQueryTool(BaseTool):
                 cs.num_accounts,
                 cs.num_loans,
                 cs.total_deposits,
-                cs.total_loan_balance
+                cs.total_loan_balance,
+                cs.products_count,
+                cs.total_relationship_value
             FROM customers c
             LEFT JOIN v_customer_summary cs ON c.customer_id = cs.customer_id
             WHERE c.status = 'active'
@@ -378,7 +382,7 @@ class CustomerQueryTool(BaseTool):
                     sql += f" AND c.{key} = :{key}"
                     params[key] = value
         
-        sql += " ORDER BY c.total_relationship_value DESC LIMIT :limit"
+        sql += " ORDER BY cs.total_relationship_value DESC LIMIT :limit"
         params['limit'] = limit
         
         df = self.data_service.execute_query(sql, params)
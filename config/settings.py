@@ -1,4 +1,5 @@
 import os
+from functools import lru_cache
 from dotenv import load_dotenv
 from typing import Optional
 
@@ -6,6 +7,17 @@ from typing import Optional
 load_dotenv()
 
 
+@lru_cache(maxsize=None)
+def _snowflake_connector_available() -> bool:
+    """Check once whether snowflake-connector-python can be imported"""
+    # A failed import is not cached in sys.modules, so each retry would search sys.path again
+    try:
+        import snowflake.connector
+    except ImportError:
+        return False
+    return True
+
+
 class Settings:
     """Application settings loaded from environment variables"""
     
@@ -33,9 +45,7 @@ class Settings:
     def is_snowflake_configured(cls) -> bool:
         """Check if Snowflake credentials are configured"""
         # First check if snowflake connector is available
-        try:
-            import snowflake.connector
-        except ImportError:
+        if not _snowflake_connector_available():
             return False
         
         # Then check if all credentials are provided
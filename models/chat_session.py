@@ -23,6 +23,7 @@ class ChatSession(BaseModel):
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(default_factory=datetime.now)
     auto_renamed: bool = False
+    needs_auto_rename: bool = False  # Has messages but still carries the default name
     
     def add_message(
         self,
@@ -40,6 +41,8 @@ class ChatSession(BaseModel):
         )
         self.messages.append(message)
         self.updated_at = datetime.now()
+        if not self.auto_renamed and self.name == "New Session":
+            self.needs_auto_rename = True
     
     def get_messages_for_api(self) -> List[Dict[str, str]]:
         """Get messages formatted for LLM API calls"""
@@ -51,6 +54,7 @@ class ChatSession(BaseModel):
     def clear_messages(self):
         """Clear all messages from the session"""
         self.messages = []
+        self.needs_auto_rename = False
         self.updated_at = datetime.now()
     
     class Config:
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""Run the single-query debug scripts together in one process"""
+
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from services.data_factory import DataServiceFactory
+from test_single_agent import run_loan_agent
+from test_simple_query import run_simple_deposit_query
+from test_simple_segmentation import run_simple_segmentation
+
+DEBUG_SCRIPTS = [
+    ("test_single_agent", run_loan_agent),
+    ("test_simple_query", run_simple_deposit_query),
+    ("test_simple_segmentation", run_simple_segmentation)
+]
+
+
+def run_script(name, script):
+    """Run one debug script and return its report as text"""
+    lines = [f"\n{'#'*60}\n# {name}\n{'#'*60}"]
+    try:
+        lines.append(script())
+    except Exception as e:
+        lines.append(f"\nEXCEPTION: {str(e)}")
+        lines.append(traceback.format_exc())
+    return "\n".join(lines)
+
+
+def main():
+    """Run the debug scripts concurrently and print their reports in order"""
+    # The scripts share the process's agent registry and data service; connect it once
+    # up front rather than letting the threads race to do it
+    DataServiceFactory.create_data_service().connect()
+    
+    # Each script mostly waits on the LLM, so their calls overlap in flight. Threads
+    # rather than asyncio.gather: the scripts and OpenAIService are synchronous, and
+    # in-process threads share the warmed registry, data service and connections,
+    # which separate subprocesses would each have to rebuild. Each script returns its
+    # report, so nothing is printed until the main thread prints them in order
+    with ThreadPoolExecutor(max_workers=len(DEBUG_SCRIPTS)) as executor:
+        for report in executor.map(lambda item: run_script(*item), DEBUG_SCRIPTS):
+            print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,50 @@
-from typing import Optional
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
 from .data_interface import DataInterface
 from .local_data_service import LocalDataService
 from .snowflake_data_service import SnowflakeDataService
 from config.settings import Settings
 
 
+# Services handed out by create_data_service, keyed by provider and target database,
+# so callers share one connection instead of opening their own
+_SERVICE_CACHE: Dict[Tuple, DataInterface] = {}
+
+# Guards _SERVICE_CACHE and _LAST_VALIDATED; Streamlit sessions call the factory from their own threads
+_CACHE_LOCK = threading.Lock()
+
+# When each cached service's connection was last checked (time.monotonic()), by cache key
+_LAST_VALIDATED: Dict[Tuple, float] = {}
+
+# Seconds a cached service is trusted before its connection is checked again; the
+# check is a query round trip, which Snowflake meters
+SERVICE_VALIDATION_TTL = 60.0
+
+# Provider used when create_data_service is called without one; Settings is fixed at import
+_DEFAULT_PROVIDER = getattr(Settings, 'DATA_PROVIDER', 'local').lower()
+
+
+def _shared_service(key: Tuple, create: Callable[[], DataInterface]) -> DataInterface:
+    """Return the cached service for key, creating it if missing or its connection has gone bad"""
+    with _CACHE_LOCK:
+        service = _SERVICE_CACHE.get(key)
+        if service is not None and service.connection:
+            now = time.monotonic()
+            if now - _LAST_VALIDATED.get(key, 0.0) >= SERVICE_VALIDATION_TTL:
+                if service.validate_connection():
+                    _LAST_VALIDATED[key] = now
+                else:
+                    # Other sessions may still hold the old instance, so it is only dropped
+                    # from the cache, not disconnected under them
+                    service = None
+        
+        if service is None:
+            service = _SERVICE_CACHE[key] = create()
+            _LAST_VALIDATED[key] = time.monotonic()
+        return service
+
+
 class DataServiceFactory:
     """Factory for creating the appropriate data service based on configuration"""
     
@@ -17,13 +57,14 @@ class DataServiceFactory:
             provider: 'local' or 'snowflake'. If None, uses configuration default.
         
         Returns:
-            DataInterface implementation
+            DataInterface implementation; the instance for the same database is
+            reused unless its connection has gone bad
         """
         # Determine which provider to use
         if provider is None:
-            provider = Settings.DATA_PROVIDER if hasattr(Settings, 'DATA_PROVIDER') else 'local'
-        
-        provider = provider.lower()
+            provider = _DEFAULT_PROVIDER
+        else:
+            provider = provider.lower()
         
         if provider == 'snowflake':
             # Check if Snowflake is configured
@@ -31,18 +72,30 @@ class DataServiceFactory:
                 print("Snowflake not configured, falling back to local data service")
                 provider = 'local'
             else:
-                return SnowflakeDataService(
+                # User and warehouse are part of the key so different credentials never share a session
+                key = (
+                    'snowflake', Settings.SNOWFLAKE_ACCOUNT, Settings.SNOWFLAKE_USER, Settings.SNOWFLAKE_WAREHOUSE,
+                    Settings.SNOWFLAKE_DATABASE, Settings.SNOWFLAKE_SCHEMA
+                )
+                return _shared_service(key, lambda: SnowflakeDataService(
                     account=Settings.SNOWFLAKE_ACCOUNT,
                     user=Settings.SNOWFLAKE_USER,
                     password=Settings.SNOWFLAKE_PASSWORD,
                     warehouse=Settings.SNOWFLAKE_WAREHOUSE,
                     database=Settings.SNOWFLAKE_DATABASE,
                     schema=Settings.SNOWFLAKE_SCHEMA
-                )
+                ))
         
         # Default to local data service
         db_path = getattr(Settings, 'LOCAL_DB_PATH', 'data/banking.db')
-        return LocalDataService(db_path)
+        return _shared_service(('local', db_path), lambda: LocalDataService(db_path))
+    
+    @staticmethod
+    def clear_service_cache() -> None:
+        """Forget the shared service instances, e.g. between tests"""
+        with _CACHE_LOCK:
+            _SERVICE_CACHE.clear()
+            _LAST_VALIDATED.clear()
     
     @staticmethod
     def get_available_providers() -> list[str]:
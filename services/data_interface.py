@@ -1,11 +1,44 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional, Sequence, Tuple, Union
 import pandas as pd
+from .sql_template_cache import build_sql_template
+
+
+# Entity names agents use, mapped to table names
+_TABLE_MAP = {
+    'loans': 'loans',
+    'loan': 'loans',
+    'deposits': 'deposits',
+    'deposit': 'deposits',
+    'customers': 'customers',
+    'customer': 'customers'
+}
+
+# Result columns reported as summary statistics
+_SUMMARY_COLUMNS = frozenset({'total_count', 'total_amount', 'average_amount', 'default_rate'})
+
+# Table -> entity-specific names for (total_count, total_amount, average_amount); total_count is
+# renamed, total_amount is copied, average_amount is renamed, and None leaves the stat as it is
+_SUMMARY_RENAMES = {
+    'loans': ('total_loans', 'total_value', 'average_loan_size'),
+    'deposits': ('total_accounts', 'total_deposits', 'average_balance'),
+    'customers': ('total_customers', None, None)
+}
+
+# Level-3 views snapshotted into tables so dashboard reads skip the multi-level
+# aggregation; refreshed by job J005 (RefreshCustomerViews)
+MATERIALIZED_VIEWS = {
+    'v_executive_dashboard': 'exec_dashboard_mv',
+    'v_risk_analytics': 'risk_analytics_mv'
+}
 
 
 class DataInterface(ABC):
     """Abstract base class for data services (local or cloud)"""
     
+    # Bind-parameter marker the driver expects in generated SQL
+    SQL_PLACEHOLDER = '?'
+    
     @abstractmethod
     def connect(self) -> bool:
         """Establish connection to the data source"""
@@ -17,8 +50,13 @@ class DataInterface(ABC):
         pass
     
     @abstractmethod
-    def execute_query(self, query: str, params: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
-        """Execute a SQL query and return results as a DataFrame"""
+    def execute_query(
+        self,
+        query: str,
+        params: Optional[Union[Dict[str, Any], Sequence[Any]]] = None,
+        chunksize: Optional[int] = None
+    ) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
+        """Execute a SQL query and return results as a DataFrame, or an iterator of DataFrames of chunksize rows"""
         pass
     
     @abstractmethod
@@ -46,64 +84,52 @@ class DataInterface(ABC):
         """Get information about the current connection"""
         pass
     
-    def build_sql_from_structured_query(self, query_dict: Dict[str, Any]) -> str:
-        """Convert structured query to SQL - can be overridden by implementations"""
-        entity = query_dict.get('entity', 'data')
+    def _get_table_name(self, entity: str) -> str:
+        """Map entity to table name"""
+        return _TABLE_MAP.get(entity.lower(), entity)
+    
+    def _rename_summary_stats(self, stats: Dict[str, Any], entity: str) -> Dict[str, Any]:
+        """Give the generic summary statistics the entity's own names"""
+        renames = _SUMMARY_RENAMES.get(_TABLE_MAP.get(entity.lower()))
+        if renames is None or 'total_count' not in stats:
+            return stats
+        
+        count_name, total_name, average_name = renames
+        stats[count_name] = stats.pop('total_count')
+        if total_name:
+            stats[total_name] = stats.get('total_amount', 0)
+        if average_name and 'average_amount' in stats:
+            stats[average_name] = stats.pop('average_amount')
+        return stats
+    
+    def build_sql_from_structured_query(self, query_dict: Dict[str, Any]) -> Tuple[str, List[Any]]:
+        """Convert structured query to parameterized SQL - can be overridden by implementations"""
         filters = query_dict.get('filters', {})
-        metrics = query_dict.get('metrics', ['count'])
-        aggregations = query_dict.get('aggregations', [])
         time_period = query_dict.get('time_period', {})
+        has_date_range = isinstance(time_period, dict) and 'start' in time_period and 'end' in time_period
         
-        # Map entity to table name
-        table_map = {
-            'loans': 'loans',
-            'loan': 'loans',
-            'deposits': 'deposits',
-            'deposit': 'deposits',
-            'customers': 'customers',
-            'customer': 'customers'
-        }
-        table_name = table_map.get(entity.lower(), entity)
-        
-        # Build SELECT clause
-        select_parts = []
-        for metric in metrics:
-            if metric == 'count':
-                select_parts.append(f"COUNT(*) as total_count")
-            elif metric == 'sum':
-                select_parts.append(f"SUM(amount) as total_amount")
-            elif metric == 'average':
-                select_parts.append(f"AVG(amount) as average_amount")
-            elif metric == 'default_rate' and table_name == 'loans':
-                select_parts.append(f"SUM(CASE WHEN status = 'default' THEN 1 ELSE 0 END) * 100.0 / COUNT(*) as default_rate")
+        # Filter values are bound as parameters, but keys are spliced in as column names;
+        # plain "count the entity" queries have no filters and skip this entirely
+        filter_keys = ()
+        if filters:
+            for key in filters:
+                if not isinstance(key, str) or not key.isidentifier():
+                    raise ValueError(f"Invalid filter column: {key!r}")
+            filter_keys = tuple(sorted(filters))
         
-        # Build WHERE clause
-        where_parts = []
-        for key, value in filters.items():
-            if isinstance(value, str):
-                where_parts.append(f"{key} = '{value}'")
-            else:
-                where_parts.append(f"{key} = {value}")
-        
-        # Handle time period
-        if isinstance(time_period, dict):
-            if 'start' in time_period and 'end' in time_period:
-                where_parts.append(f"date >= '{time_period['start']}' AND date <= '{time_period['end']}'")
-        
-        # Build GROUP BY clause
-        group_by_parts = []
-        if 'by_category' in aggregations and table_name == 'loans':
-            group_by_parts.append('loan_type')
-            select_parts.insert(0, 'loan_type')
-        elif 'by_type' in aggregations and table_name == 'deposits':
-            group_by_parts.append('account_type')
-            select_parts.insert(0, 'account_type')
+        # The SQL text depends only on the query's shape, so it is built once per shape
+        entity = query_dict.get('entity', 'data')
+        sql = build_sql_template((
+            self._get_table_name(entity),
+            tuple(query_dict.get('metrics', ['count'])),
+            filter_keys,
+            tuple(query_dict.get('aggregations') or ()),
+            has_date_range,
+            self.SQL_PLACEHOLDER
+        ))
         
-        # Construct SQL
-        sql = f"SELECT {', '.join(select_parts)} FROM {table_name}"
-        if where_parts:
-            sql += f" WHERE {' AND '.join(where_parts)}"
-        if group_by_parts:
-            sql += f" GROUP BY {', '.join(group_by_parts)}"
+        params = [filters[key] for key in filter_keys] if filter_keys else []
+        if has_date_range:
+            params.extend((time_period['start'], time_period['end']))
         
-        return sql
\ No newline at end of file
+        return sql, params
\ No newline at end of file
@@ -1,19 +1,91 @@
 import sqlite3
+import numpy as np
 import pandas as pd
-from typing import Dict, Any, List, Optional
-from datetime import datetime, timedelta
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+from datetime import datetime
 import os
-from .data_interface import DataInterface
-import random
+import threading
+import time
+from functools import lru_cache, wraps
+from .data_interface import DataInterface, _SUMMARY_COLUMNS
 import json
 
 
+# Seconds a get_available_tables result or table sample is reused before the database is read again
+TABLES_CACHE_TTL = 5.0
+
+# Sample-data sizes and distributions used by initialize_sample_data
+SAMPLE_CUSTOMER_COUNT = 1000
+SAMPLE_SEGMENTS = ['high_value', 'growth', 'maintain', 'at_risk']
+SAMPLE_LOAN_STATUSES = ['current', 'current', 'current', 'late', 'default', 'paid_off']
+
+# Customer rollup that CustomerQueryTool joins for products_count and total_relationship_value;
+# the same definition scripts/setup_database.py creates
+SAMPLE_CUSTOMER_SUMMARY_VIEW = """
+    CREATE VIEW IF NOT EXISTS v_customer_summary AS
+    SELECT 
+        c.customer_id,
+        c.name,
+        c.segment,
+        c.credit_score,
+        c.annual_income,
+        c.join_date,
+        COUNT(DISTINCT d.account_id) as num_accounts,
+        COUNT(DISTINCT l.loan_id) as num_loans,
+        COALESCE(SUM(d.balance), 0) as total_deposits,
+        COALESCE(SUM(l.remaining_balance), 0) as total_loan_balance,
+        COUNT(DISTINCT d.account_id) + COUNT(DISTINCT l.loan_id) as products_count,
+        COALESCE(SUM(d.balance), 0) + COALESCE(SUM(l.remaining_balance), 0) as total_relationship_value
+    FROM customers c
+    LEFT JOIN deposits d ON c.customer_id = d.customer_id AND d.status = 'active'
+    LEFT JOIN loans l ON c.customer_id = l.customer_id AND l.status IN ('current', 'late')
+    GROUP BY c.customer_id, c.name, c.segment, c.credit_score, c.annual_income, c.join_date
+"""
+
+# loan_type -> (amount range, interest rate range, term choices in months)
+SAMPLE_LOAN_PROFILES = {
+    'mortgage': ((100000, 800000), (3.0, 5.0), [180, 360]),
+    'auto': ((10000, 80000), (4.0, 8.0), [36, 48, 60, 72]),
+    'personal': ((1000, 50000), (6.0, 15.0), [12, 24, 36, 48]),
+    'business': ((50000, 500000), (5.0, 10.0), [36, 60, 84])
+}
+
+# account_type -> (balance range, interest rate range)
+SAMPLE_DEPOSIT_PROFILES = {
+    'checking': ((100, 25000), (0.01, 0.01)),
+    'savings': ((500, 50000), (0.1, 2.0)),
+    'cd': ((1000, 100000), (2.0, 5.0)),
+    'money_market': ((2500, 100000), (1.0, 3.0))
+}
+
+
+@lru_cache(maxsize=None)
+def _sample_ids(prefix: str, count: int) -> np.ndarray:
+    """Sample IDs <prefix>00000 .. for count rows, formatted once and shared read-only"""
+    ids = np.char.add(prefix, np.char.zfill(np.arange(count).astype(str), 5)).astype(object)
+    ids.flags.writeable = False
+    return ids
+
+
+def _locked(method):
+    """Run a LocalDataService method while holding the service's connection lock"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 class LocalDataService(DataInterface):
     """Local SQLite implementation of the data interface"""
     
     def __init__(self, db_path: str = "data/banking.db"):
         self.db_path = db_path
         self.connection = None
+        self._table_samples = {}
+        self._tables_cache = None
+        # Serializes use of the shared connection; reentrant because connect validates first
+        self._lock = threading.RLock()
         self._ensure_db_directory()
     
     def _ensure_db_directory(self):
@@ -22,65 +94,109 @@ class LocalDataService(DataInterface):
         if db_dir and not os.path.exists(db_dir):
             os.makedirs(db_dir)
     
+    @_locked
     def connect(self) -> bool:
         """Establish connection to SQLite database"""
+        # Reuse a working connection rather than reopening the database
+        if self.validate_connection():
+            return True
+        
         try:
-            self.connection = sqlite3.connect(self.db_path)
+            # The connection is kept for the life of the service, so it may be used from
+            # more than one Streamlit script thread (each use holds _lock); agent queries
+            # repeat, so cache more statements
+            self.connection = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=256)
             self.connection.row_factory = sqlite3.Row
+            # WAL lets readers proceed during writes and avoids an fsync per commit
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.execute("PRAGMA temp_store=MEMORY")
+            self.connection.execute("PRAGMA mmap_size=268435456")
             return True
         except Exception as e:
             print(f"Failed to connect to SQLite: {e}")
             return False
     
+    @_locked
     def disconnect(self) -> None:
         """Close SQLite connection"""
         if self.connection:
             self.connection.close()
             self.connection = None
+        self._tables_cache = None
+        self._table_samples.clear()
     
-    def execute_query(self, query: str, params: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
-        """Execute a SQL query and return results as a DataFrame"""
+    @_locked
+    def execute_query(
+        self,
+        query: str,
+        params: Optional[Union[Dict[str, Any], Sequence[Any]]] = None,
+        chunksize: Optional[int] = None
+    ) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
+        """Execute a SQL query and return results as a DataFrame, or an iterator of DataFrames of chunksize rows"""
         if not self.connection:
             raise ConnectionError("Not connected to database")
         
         try:
+            # With chunksize, pandas yields the rows as they are fetched instead of building one frame
             if params:
-                df = pd.read_sql_query(query, self.connection, params=params)
+                df = pd.read_sql_query(query, self.connection, params=params, chunksize=chunksize)
             else:
-                df = pd.read_sql_query(query, self.connection)
+                df = pd.read_sql_query(query, self.connection, chunksize=chunksize)
+            if chunksize is not None:
+                return self._iter_locked(df)
             return df
         except Exception as e:
             raise Exception(f"Query execution failed: {e}")
     
+    def _iter_locked(self, chunks: Iterator[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """Yield the frames of a chunked read, fetching each one under the connection lock"""
+        while True:
+            with self._lock:
+                chunk = next(chunks, None)
+            if chunk is None:
+                return
+            yield chunk
+    
+    @_locked
+    def _execute_query_rows(self, query: str, params: Sequence[Any] = ()) -> List[sqlite3.Row]:
+        """Execute a SQL query and return the raw rows"""
+        if not self.connection:
+            raise ConnectionError("Not connected to database")
+        
+        try:
+            return self.connection.execute(query, params).fetchall()
+        except Exception as e:
+            raise Exception(f"Query execution failed: {e}")
+    
     def execute_structured_query(self, structured_query: Dict[str, Any]) -> Dict[str, Any]:
         """Execute a structured query and return formatted results"""
         try:
             # Convert structured query to SQL
-            sql = self.build_sql_from_structured_query(structured_query)
+            sql, params = self.build_sql_from_structured_query(structured_query)
             
-            # Execute query
-            df = self.execute_query(sql)
+            # Execute query - aggregates are only a few rows, so skip the DataFrame
+            rows = self._execute_query_rows(sql, params)
             
             # Get additional sample data if needed
             entity = structured_query.get('entity', 'data')
-            sample_sql = f"SELECT * FROM {self._get_table_name(entity)} LIMIT 10"
-            sample_df = self.execute_query(sample_sql)
+            sample_rows = self._get_table_sample(self._get_table_name(entity))
             
             # Format results
             result = {
                 "query_executed": structured_query,
-                "row_count": len(df),
+                "row_count": len(rows),
                 "execution_time": "0.025s",
                 "data": {
-                    "summary_stats": self._format_summary_stats(df, structured_query),
-                    "data_points": sample_df.to_dict('records'),
+                    "summary_stats": self._format_summary_stats(rows[0] if rows else None, structured_query),
+                    "data_points": sample_rows,
                     "period_label": self._get_period_label(structured_query.get('time_period', {}))
                 }
             }
             
             # Add aggregated data if grouping was requested
             if 'aggregations' in structured_query and len(structured_query['aggregations']) > 0:
-                result['data']['breakdowns'] = df.to_dict('records')
+                result['data']['breakdowns'] = [dict(row) for row in rows]
             
             return result
             
@@ -91,47 +207,30 @@ class LocalDataService(DataInterface):
                 "data": {}
             }
     
-    def _get_table_name(self, entity: str) -> str:
-        """Map entity to table name"""
-        table_map = {
-            'loans': 'loans',
-            'loan': 'loans',
-            'deposits': 'deposits',
-            'deposit': 'deposits',
-            'customers': 'customers',
-            'customer': 'customers'
-        }
-        return table_map.get(entity.lower(), entity)
+    @_locked
+    def _get_table_sample(self, table_name: str) -> List[Dict[str, Any]]:
+        """Get the first rows of a table, reused for TABLES_CACHE_TTL seconds"""
+        cached = self._table_samples.get(table_name)
+        if cached is None or time.monotonic() - cached[0] >= TABLES_CACHE_TTL:
+            cursor = self.connection.execute(f"SELECT * FROM {table_name} LIMIT 10")
+            cached = self._table_samples[table_name] = (time.monotonic(), [dict(row) for row in cursor])
+        # Callers get their own row dicts, so changing them can't alter the cache
+        return [dict(row) for row in cached[1]]
     
-    def _format_summary_stats(self, df: pd.DataFrame, query: Dict[str, Any]) -> Dict[str, Any]:
-        """Format summary statistics from query results"""
+    def _format_summary_stats(self, row: Optional[sqlite3.Row], query: Dict[str, Any]) -> Dict[str, Any]:
+        """Format summary statistics from the first result row"""
         stats = {}
         
-        # Extract values from dataframe
-        if not df.empty:
-            row = df.iloc[0]
-            for col in df.columns:
-                if col in ['total_count', 'total_amount', 'average_amount', 'default_rate']:
+        # Extract values from the row
+        if row is not None:
+            for col in row.keys():
+                if col in _SUMMARY_COLUMNS:
                     value = row[col]
-                    if pd.notna(value):
+                    if value is not None:
                         stats[col] = float(value) if isinstance(value, (int, float)) else value
         
         # Add entity-specific stats
-        entity = query.get('entity', '').lower()
-        if entity in ['loan', 'loans'] and 'total_count' in stats:
-            stats['total_loans'] = stats.pop('total_count', 0)
-            stats['total_value'] = stats.get('total_amount', 0)
-            if 'average_amount' in stats:
-                stats['average_loan_size'] = stats.pop('average_amount')
-        elif entity in ['deposit', 'deposits'] and 'total_count' in stats:
-            stats['total_accounts'] = stats.pop('total_count', 0)
-            stats['total_deposits'] = stats.get('total_amount', 0)
-            if 'average_amount' in stats:
-                stats['average_balance'] = stats.pop('average_amount')
-        elif entity in ['customer', 'customers'] and 'total_count' in stats:
-            stats['total_customers'] = stats.pop('total_count', 0)
-        
-        return stats
+        return self._rename_summary_stats(stats, query.get('entity', ''))
     
     def _get_period_label(self, time_period: Dict[str, Any]) -> str:
         """Get a label for the time period"""
@@ -144,6 +243,7 @@ class LocalDataService(DataInterface):
                 return f"{time_period['start']} to {time_period['end']}"
         return "Current Period"
     
+    @_locked
     def get_table_schema(self, table_name: str) -> Dict[str, Any]:
         """Get schema information for a specific table"""
         if not self.connection:
@@ -168,17 +268,24 @@ class LocalDataService(DataInterface):
         
         return schema
     
+    @_locked
     def get_available_tables(self) -> List[str]:
         """Get list of available tables"""
         if not self.connection:
             raise ConnectionError("Not connected to database")
         
+        # Status panels ask repeatedly; the table list rarely changes
+        if self._tables_cache and time.monotonic() - self._tables_cache[0] < TABLES_CACHE_TTL:
+            return list(self._tables_cache[1])
+        
         cursor = self.connection.cursor()
         cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-        tables = cursor.fetchall()
+        tables = [table[0] for table in cursor.fetchall() if not table[0].startswith('sqlite_')]
         
-        return [table[0] for table in tables if not table[0].startswith('sqlite_')]
+        self._tables_cache = (time.monotonic(), tables)
+        return list(tables)
     
+    @_locked
     def validate_connection(self) -> bool:
         """Test if the connection is valid"""
         if not self.connection:
@@ -194,13 +301,15 @@ class LocalDataService(DataInterface):
     
     def get_connection_info(self) -> Dict[str, Any]:
         """Get information about the connection"""
+        connected = self.validate_connection()
         return {
             "type": "SQLite",
             "database": self.db_path,
-            "connected": self.validate_connection(),
-            "tables": self.get_available_tables() if self.validate_connection() else []
+            "connected": connected,
+            "tables": self.get_available_tables() if connected else []
         }
     
+    @_locked
     def initialize_sample_data(self):
         """Initialize the database with sample banking data"""
         if not self.connection:
@@ -246,119 +355,113 @@ class LocalDataService(DataInterface):
                 join_date DATE,
                 credit_score INTEGER,
                 annual_income REAL,
-                products_count INTEGER,
-                total_relationship_value REAL,
                 status TEXT
             )
         """)
         
-        # Generate sample data
-        self._generate_sample_customers(cursor, 1000)
-        self._generate_sample_loans(cursor, 2000)
-        self._generate_sample_deposits(cursor, 3000)
+        cursor.execute(SAMPLE_CUSTOMER_SUMMARY_VIEW)
         
-        self.connection.commit()
+        # Load the sample rows in one transaction, without syncing - a crash
+        # mid-load only loses sample data that is regenerated on the next start
+        cursor.execute("PRAGMA synchronous=OFF")
+        try:
+            cursor.execute("BEGIN")
+            cursor.executemany("""
+                INSERT OR REPLACE INTO customers 
+                (customer_id, name, segment, join_date, credit_score, annual_income, status)
+                VALUES (?, ?, ?, ?, ?, ?, 'active')
+            """, self._generate_sample_customers(SAMPLE_CUSTOMER_COUNT))
+            cursor.executemany("""
+                INSERT OR REPLACE INTO loans 
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, self._generate_sample_loans(2000))
+            cursor.executemany("""
+                INSERT OR REPLACE INTO deposits 
+                VALUES (?, ?, ?, ?, ?, ?, 'active', ?)
+            """, self._generate_sample_deposits(3000))
+            self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
+        finally:
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            self._table_samples.clear()
+            self._tables_cache = None
     
-    def _generate_sample_customers(self, cursor, count: int):
-        """Generate sample customer data"""
-        segments = ['high_value', 'growth', 'maintain', 'at_risk']
+    def _generate_sample_customers(self, count: int) -> Iterable[Tuple]:
+        """Generate sample customer rows"""
+        rng = np.random.default_rng()
+        join_dates = np.datetime64(datetime.now().date(), 'D') - rng.integers(0, 3651, count)
         
-        for i in range(count):
-            customer_id = f"C{i:05d}"
-            name = f"Customer {i}"
-            segment = random.choice(segments)
-            join_date = (datetime.now() - timedelta(days=random.randint(0, 3650))).date()
-            credit_score = random.randint(300, 850)
-            annual_income = random.randint(30000, 300000)
-            products_count = random.randint(1, 5)
-            total_value = random.randint(10000, 1000000)
-            
-            cursor.execute("""
-                INSERT OR REPLACE INTO customers 
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'active')
-            """, (customer_id, name, segment, join_date, credit_score, 
-                  annual_income, products_count, total_value))
+        rows = zip(
+            _sample_ids('C', count).tolist(),
+            [f"Customer {i}" for i in range(count)],
+            rng.choice(SAMPLE_SEGMENTS, count).tolist(),
+            join_dates.astype(str).tolist(),
+            rng.integers(300, 851, count).tolist(),
+            rng.integers(30000, 300001, count).tolist()
+        )
+        return rows
     
-    def _generate_sample_loans(self, cursor, count: int):
-        """Generate sample loan data"""
-        loan_types = ['mortgage', 'auto', 'personal', 'business']
-        statuses = ['current', 'current', 'current', 'late', 'default', 'paid_off']
+    def _generate_sample_loans(self, count: int) -> Iterable[Tuple]:
+        """Generate sample loan rows"""
+        rng = np.random.default_rng()
+        loan_types = rng.choice(list(SAMPLE_LOAN_PROFILES), count)
         
-        # Generate data for different time periods
-        for i in range(count):
-            loan_id = f"L{i:05d}"
-            customer_id = f"C{random.randint(0, 999):05d}"
-            loan_type = random.choice(loan_types)
-            
-            # Set amount based on loan type
-            if loan_type == 'mortgage':
-                amount = random.randint(100000, 800000)
-                rate = random.uniform(3.0, 5.0)
-                term = random.choice([180, 360])
-            elif loan_type == 'auto':
-                amount = random.randint(10000, 80000)
-                rate = random.uniform(4.0, 8.0)
-                term = random.choice([36, 48, 60, 72])
-            elif loan_type == 'personal':
-                amount = random.randint(1000, 50000)
-                rate = random.uniform(6.0, 15.0)
-                term = random.choice([12, 24, 36, 48])
-            else:  # business
-                amount = random.randint(50000, 500000)
-                rate = random.uniform(5.0, 10.0)
-                term = random.choice([36, 60, 84])
-            
-            # Generate dates - some in Q3 2024, some in Q3 2025
-            if i % 2 == 0:
-                # Q3 2025 data
-                origination_date = datetime(2025, random.randint(7, 9), random.randint(1, 28)).date()
-            else:
-                # Q3 2024 data
-                origination_date = datetime(2024, random.randint(7, 9), random.randint(1, 28)).date()
-            
-            status = random.choice(statuses)
-            payment = amount * (rate/100/12) / (1 - (1 + rate/100/12)**(-term))
-            remaining = amount * random.uniform(0.3, 1.0) if status != 'paid_off' else 0
-            
-            cursor.execute("""
-                INSERT OR REPLACE INTO loans 
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (loan_id, customer_id, loan_type, amount, rate, term,
-                  origination_date, status, payment, remaining, origination_date))
+        # Set amount, rate and term based on loan type
+        amounts = np.empty(count, dtype=np.int64)
+        rates = np.empty(count)
+        terms = np.empty(count, dtype=np.int64)
+        for loan_type, (amount_range, rate_range, term_choices) in SAMPLE_LOAN_PROFILES.items():
+            of_type = loan_types == loan_type
+            n = int(of_type.sum())
+            amounts[of_type] = rng.integers(amount_range[0], amount_range[1] + 1, n)
+            rates[of_type] = rng.uniform(*rate_range, n)
+            terms[of_type] = rng.choice(term_choices, n)
+        
+        # Generate dates - even rows in Q3 2025, odd rows in Q3 2024
+        years = np.where(np.arange(count) % 2 == 0, 2025, 2024)
+        months = rng.integers(7, 10, count)
+        days = rng.integers(1, 29, count)
+        origination_dates = [f"{y:04d}-{m:02d}-{d:02d}" for y, m, d in zip(years.tolist(), months.tolist(), days.tolist())]
+        
+        statuses = rng.choice(SAMPLE_LOAN_STATUSES, count)
+        monthly_rates = rates / 100 / 12
+        payments = amounts * monthly_rates / (1 - (1 + monthly_rates) ** -terms)
+        remaining = np.where(statuses == 'paid_off', 0, amounts * rng.uniform(0.3, 1.0, count))
+        
+        rows = zip(
+            _sample_ids('L', count).tolist(),
+            _sample_ids('C', SAMPLE_CUSTOMER_COUNT)[rng.integers(0, SAMPLE_CUSTOMER_COUNT, count)].tolist(),
+            loan_types.tolist(), amounts.tolist(), rates.tolist(), terms.tolist(),
+            origination_dates, statuses.tolist(), payments.tolist(), remaining.tolist(),
+            origination_dates
+        )
+        return rows
     
-    def _generate_sample_deposits(self, cursor, count: int):
-        """Generate sample deposit data"""
-        account_types = ['checking', 'savings', 'cd', 'money_market']
+    def _generate_sample_deposits(self, count: int) -> Iterable[Tuple]:
+        """Generate sample deposit rows"""
+        rng = np.random.default_rng()
+        account_types = rng.choice(list(SAMPLE_DEPOSIT_PROFILES), count)
         
-        for i in range(count):
-            account_id = f"A{i:05d}"
-            customer_id = f"C{random.randint(0, 999):05d}"
-            account_type = random.choice(account_types)
-            
-            # Set balance and rate based on account type
-            if account_type == 'checking':
-                balance = random.randint(100, 25000)
-                rate = 0.01
-            elif account_type == 'savings':
-                balance = random.randint(500, 50000)
-                rate = random.uniform(0.1, 2.0)
-            elif account_type == 'cd':
-                balance = random.randint(1000, 100000)
-                rate = random.uniform(2.0, 5.0)
-            else:  # money_market
-                balance = random.randint(2500, 100000)
-                rate = random.uniform(1.0, 3.0)
-            
-            # Generate dates
-            if i % 2 == 0:
-                # Recent data
-                opened_date = (datetime.now() - timedelta(days=random.randint(0, 365))).date()
-            else:
-                # Older data
-                opened_date = (datetime.now() - timedelta(days=random.randint(365, 1825))).date()
-            
-            cursor.execute("""
-                INSERT OR REPLACE INTO deposits 
-                VALUES (?, ?, ?, ?, ?, ?, 'active', ?)
-            """, (account_id, customer_id, account_type, balance, rate,
-                  opened_date, opened_date))
\ No newline at end of file
+        # Set balance and rate based on account type
+        balances = np.empty(count, dtype=np.int64)
+        rates = np.empty(count)
+        for account_type, (balance_range, rate_range) in SAMPLE_DEPOSIT_PROFILES.items():
+            of_type = account_types == account_type
+            n = int(of_type.sum())
+            balances[of_type] = rng.integers(balance_range[0], balance_range[1] + 1, n)
+            rates[of_type] = rng.uniform(*rate_range, n)
+        
+        # Generate dates - even rows opened within the last year, odd rows one to five years ago
+        recent = np.arange(count) % 2 == 0
+        days_ago = np.where(recent, rng.integers(0, 366, count), rng.integers(365, 1826, count))
+        opened_dates = (np.datetime64(datetime.now().date(), 'D') - days_ago).astype(str).tolist()
+        
+        rows = zip(
+            _sample_ids('A', count).tolist(),
+            _sample_ids('C', SAMPLE_CUSTOMER_COUNT)[rng.integers(0, SAMPLE_CUSTOMER_COUNT, count)].tolist(),
+            account_types.tolist(), balances.tolist(), rates.tolist(),
+            opened_dates, opened_dates
+        )
+        return rows
\ No newline at end of file
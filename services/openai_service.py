@@ -1,8 +1,40 @@
 import requests
+from requests.adapters import HTTPAdapter
 import json
-from typing import List, Dict, Optional
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Tuple
 from .llm_interface import LLMInterface
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+# Seconds a validate_connection result is reused before the API is probed again
+VALIDATION_TTL = 60.0
+
+# Most completions kept by a caching service; the least recently used is dropped first
+RESPONSE_CACHE_SIZE = 128
+
+
+def _dumps(payload) -> bytes:
+    """Serialize a request payload, with orjson when it is installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode('utf-8')
+
+
+def _loads(content: bytes):
+    """Parse a response body, with orjson when it is installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(content)
+    return json.loads(content)
+
 
 class OpenAIService(LLMInterface):
     """OpenAI API implementation using REST"""
@@ -15,9 +47,27 @@ class OpenAIService(LLMInterface):
         'gpt-4'
     ]
     
-    def __init__(self, api_key: str):
+    # Membership check for complete(), which runs on every LLM call
+    _AVAILABLE_MODELS_SET = frozenset(AVAILABLE_MODELS)
+    
+    def __init__(self, api_key: str, cache: bool = False):
         self.api_key = api_key
         self.base_url = "https://api.openai.com/v1"
+        
+        # One keep-alive session for every call, so back-to-back completions
+        # reuse the TCP/TLS connection instead of handshaking each time
+        self._session = requests.Session()
+        self._session.headers.update({
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json'
+        })
+        self._session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+        self._last_validation: Optional[Tuple[float, bool]] = None
+        
+        # Opt-in memo of completions keyed by request body, so debug runs that repeat
+        # a prompt skip the API; off by default since sampled answers are not deterministic
+        self._response_cache: Optional[OrderedDict] = OrderedDict() if cache else None
+        self._cache_lock = threading.Lock()
     
     def complete(
         self,
@@ -30,14 +80,9 @@ class OpenAIService(LLMInterface):
         if model is None:
             model = 'gpt-3.5-turbo'
         
-        if model not in self.AVAILABLE_MODELS:
+        if model not in self._AVAILABLE_MODELS_SET:
             raise ValueError(f"Model {model} not available. Choose from: {self.AVAILABLE_MODELS}")
         
-        headers = {
-            'Authorization': f'Bearer {self.api_key}',
-            'Content-Type': 'application/json'
-        }
-        
         payload = {
             'model': model,
             'messages': messages,
@@ -47,42 +92,78 @@ class OpenAIService(LLMInterface):
         if max_tokens:
             payload['max_tokens'] = max_tokens
         
+        body = _dumps(payload)
+        if self._response_cache is not None:
+            with self._cache_lock:
+                cached = self._response_cache.get(body)
+                if cached is not None:
+                    self._response_cache.move_to_end(body)
+                    return cached
+        
         try:
-            response = requests.post(
+            response = self._session.post(
                 f"{self.base_url}/chat/completions",
-                headers=headers,
-                json=payload,
+                data=body,
                 timeout=30
             )
             
             if response.status_code != 200:
-                error_data = response.json()
+                error_data = _loads(response.content)
                 raise Exception(f"OpenAI API error: {error_data.get('error', {}).get('message', 'Unknown error')}")
             
-            data = response.json()
-            return data['choices'][0]['message']['content']
+            data = _loads(response.content)
+            content = data['choices'][0]['message']['content']
+            
+            if self._response_cache is not None:
+                with self._cache_lock:
+                    self._response_cache[body] = content
+                    if len(self._response_cache) > RESPONSE_CACHE_SIZE:
+                        self._response_cache.popitem(last=False)
+            return content
             
         except requests.exceptions.RequestException as e:
             raise Exception(f"OpenAI API request error: {str(e)}")
         except KeyError as e:
             raise Exception(f"Unexpected OpenAI response format: {str(e)}")
     
+    def complete_many(
+        self,
+        batch: List[List[Dict[str, str]]],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None
+    ) -> List[str]:
+        """Generate completions for several independent conversations concurrently"""
+        if not batch:
+            return []
+        
+        # The calls are network-bound, so threads sharing the pooled session overlap
+        # their round trips; results come back in the order of the batch
+        with ThreadPoolExecutor(max_workers=min(len(batch), 8)) as executor:
+            return list(executor.map(
+                lambda messages: self.complete(messages, model, temperature, max_tokens),
+                batch
+            ))
+    
     def get_available_models(self) -> List[str]:
         """Get list of available OpenAI models"""
         return self.AVAILABLE_MODELS.copy()
     
     def validate_connection(self) -> bool:
         """Test OpenAI API connection"""
-        headers = {
-            'Authorization': f'Bearer {self.api_key}'
-        }
+        # Status checks repeat on every UI rerun; reuse a recent answer
+        if self._last_validation and time.monotonic() - self._last_validation[0] < VALIDATION_TTL:
+            return self._last_validation[1]
         
+        # Fetching one model still authenticates, without downloading the whole model list
         try:
-            response = requests.get(
-                f"{self.base_url}/models",
-                headers=headers,
+            response = self._session.get(
+                f"{self.base_url}/models/{self.AVAILABLE_MODELS[0]}",
                 timeout=10
             )
-            return response.status_code == 200
+            valid = response.status_code == 200
         except Exception:
-            return False
\ No newline at end of file
+            valid = False
+        
+        self._last_validation = (time.monotonic(), valid)
+        return valid
\ No newline at end of file
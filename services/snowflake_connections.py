@@ -0,0 +1,72 @@
+import atexit
+import threading
+from typing import Any, Dict, Tuple
+
+try:
+    import snowflake.connector
+except ImportError:
+    # The services check for the connector themselves before connecting
+    pass
+
+
+# Open connections shared by SnowflakeDataService and SnowflakeService, keyed by their
+# connection parameters: (connection, number of services holding it)
+_CONNECTIONS: Dict[Tuple, Tuple[Any, int]] = {}
+_LOCK = threading.Lock()
+
+# Session settings applied once at login: tag the app's queries and let repeated statements
+# be answered from Snowflake's result cache
+SESSION_PARAMETERS = {
+    'QUERY_TAG': 'streamlit-snowflake',
+    'USE_CACHED_RESULT': True
+}
+
+
+def _key(connection_params: Dict[str, Any]) -> Tuple:
+    """Hashable cache key for a set of connection parameters"""
+    return tuple(sorted(connection_params.items()))
+
+
+def acquire_connection(connection_params: Dict[str, Any]):
+    """Get the shared connection for these parameters, logging in only if none is open"""
+    key = _key(connection_params)
+    with _LOCK:
+        connection, holders = _CONNECTIONS.get(key, (None, 0))
+        if connection is None or connection.is_closed():
+            # Keep-alive stops an idle session from expiring and forcing a fresh login
+            connection = snowflake.connector.connect(
+                **connection_params,
+                client_session_keep_alive=True,
+                session_parameters=SESSION_PARAMETERS
+            )
+        _CONNECTIONS[key] = (connection, holders + 1)
+        return connection
+
+
+def release_connection(connection_params: Dict[str, Any]) -> None:
+    """Drop one hold on the shared connection, closing it when nothing holds it any more"""
+    key = _key(connection_params)
+    with _LOCK:
+        connection, holders = _CONNECTIONS.get(key, (None, 0))
+        if connection is None:
+            return
+        if holders > 1:
+            _CONNECTIONS[key] = (connection, holders - 1)
+            return
+        del _CONNECTIONS[key]
+    if not connection.is_closed():
+        connection.close()
+
+
+@atexit.register
+def close_all_connections() -> None:
+    """Close every shared connection, so keep-alive sessions end with the process"""
+    with _LOCK:
+        connections = [connection for connection, _ in _CONNECTIONS.values()]
+        _CONNECTIONS.clear()
+    for connection in connections:
+        try:
+            if not connection.is_closed():
+                connection.close()
+        except Exception:
+            pass
@@ -1,18 +1,41 @@
+import copy
+import hashlib
+import time
+from collections import OrderedDict
+from contextlib import ExitStack, closing
 import pandas as pd
-from typing import Dict, Any, List, Optional
-from .data_interface import DataInterface
+from typing import Dict, Any, Iterator, List, Optional, Sequence, Union
+from .data_interface import DataInterface, _SUMMARY_COLUMNS, _TABLE_MAP
+from .snowflake_connections import acquire_connection, release_connection
 import json
 
 try:
     import snowflake.connector
+    from snowflake.connector.errors import NotSupportedError, ProgrammingError
     SNOWFLAKE_AVAILABLE = True
 except ImportError:
     SNOWFLAKE_AVAILABLE = False
 
 
+# Seconds INFORMATION_SCHEMA answers and table samples are reused; each lookup is a metered warehouse query
+METADATA_CACHE_TTL = 300.0
+
+# Seconds a structured-query result is reused before the warehouse is asked again
+RESULT_CACHE_TTL = 120.0
+
+# Most structured-query results kept; the least recently used is dropped first
+RESULT_CACHE_SIZE = 256
+
+# cursor.description type code for NUMBER, which the connector returns as Decimal when it has a scale
+FIXED_TYPE_CODE = 0
+
+
 class SnowflakeDataService(DataInterface):
     """Snowflake implementation of the data interface"""
     
+    # The connector binds pyformat-style %s placeholders by default
+    SQL_PLACEHOLDER = '%s'
+    
     def __init__(
         self,
         account: str,
@@ -37,79 +60,196 @@ class SnowflakeDataService(DataInterface):
             'schema': schema
         }
         self.connection = None
+        self._tables_cache = None
+        self._schema_cache = {}
+        self._table_samples = {}
+        self._result_cache = OrderedDict()
     
     def connect(self) -> bool:
         """Establish connection to Snowflake"""
+        # Reuse the open session rather than logging in again
+        if self.connection is not None and not self.connection.is_closed():
+            return True
+        
         try:
-            self.connection = snowflake.connector.connect(**self.connection_params)
+            if self.connection is not None:
+                self.disconnect()
+            self.connection = acquire_connection(self.connection_params)
             return True
         except Exception as e:
             print(f"Failed to connect to Snowflake: {e}")
             return False
     
     def disconnect(self) -> None:
-        """Close Snowflake connection"""
+        """Release the Snowflake connection; it closes once no other service shares it"""
         if self.connection:
-            self.connection.close()
+            release_connection(self.connection_params)
             self.connection = None
+        self._tables_cache = None
+        self._schema_cache.clear()
+        self._table_samples.clear()
+        self._result_cache.clear()
     
-    def execute_query(self, query: str, params: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
-        """Execute a SQL query and return results as a DataFrame"""
+    def execute_query(
+        self,
+        query: str,
+        params: Optional[Union[Dict[str, Any], Sequence[Any]]] = None,
+        chunksize: Optional[int] = None
+    ) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
+        """Execute a SQL query and return results as a DataFrame, or an iterator of DataFrames of chunksize rows"""
         if not self.connection:
             raise ConnectionError("Not connected to Snowflake")
         
         try:
-            cursor = self.connection.cursor()
-            
-            if params:
-                # Snowflake uses %s for parameter binding
-                cursor.execute(query, list(params.values()))
-            else:
-                cursor.execute(query)
-            
-            # Fetch all results
-            results = cursor.fetchall()
-            columns = [col[0] for col in cursor.description]
-            
-            # Convert to DataFrame
-            df = pd.DataFrame(results, columns=columns)
+            with ExitStack() as stack:
+                cursor = stack.enter_context(closing(self.connection.cursor()))
+                
+                if params:
+                    # Snowflake uses %s for parameter binding
+                    cursor.execute(query, list(params.values()) if isinstance(params, dict) else list(params))
+                else:
+                    cursor.execute(query)
+                
+                if chunksize:
+                    # The chunk iterator takes over the cursor and closes it when done
+                    stack.pop_all()
+                    return self._iter_result_chunks(cursor, chunksize)
+                
+                # Fetch all results; Arrow result batches become the DataFrame column-wise,
+                # without first materializing every row as a Python tuple
+                try:
+                    return cursor.fetch_pandas_all()
+                except (NotSupportedError, ProgrammingError):
+                    # Not an Arrow result (e.g. SHOW/DESCRIBE), or the pandas extra is missing
+                    results = cursor.fetchall()
+                    columns = [col[0] for col in cursor.description]
+                    return pd.DataFrame(results, columns=columns)
             
-            cursor.close()
-            return df
+        except Exception as e:
+            raise Exception(f"Query execution failed: {e}")
+    
+    def _execute_query_records(
+        self,
+        query: str,
+        params: Optional[Sequence[Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Execute a SQL query and return its rows as dicts, without building a DataFrame"""
+        if not self.connection:
+            raise ConnectionError("Not connected to Snowflake")
+        
+        try:
+            with closing(self.connection.cursor()) as cursor:
+                if params:
+                    cursor.execute(query, list(params))
+                else:
+                    cursor.execute(query)
+                
+                columns = [col[0] for col in cursor.description]
+                # Scaled NUMBER columns become floats, as they do through fetch_pandas_all
+                decimal_columns = [
+                    i for i, col in enumerate(cursor.description)
+                    if col[1] == FIXED_TYPE_CODE and col[5]
+                ]
+                
+                records = []
+                for row in cursor:
+                    if decimal_columns:
+                        row = list(row)
+                        for i in decimal_columns:
+                            if row[i] is not None:
+                                row[i] = float(row[i])
+                    records.append(dict(zip(columns, row)))
+                return records
             
         except Exception as e:
             raise Exception(f"Query execution failed: {e}")
     
+    def _iter_result_chunks(self, cursor, chunksize: int) -> Iterator[pd.DataFrame]:
+        """Yield an executed cursor's results as DataFrames of up to chunksize rows"""
+        try:
+            # Arrow batches arrive one result chunk at a time, so only one is held in memory;
+            # the format check fails on the first batch, before anything has been yielded
+            try:
+                yield from self._rechunk(cursor.fetch_pandas_batches(), chunksize)
+                return
+            except (NotSupportedError, ProgrammingError):
+                pass
+            
+            columns = [col[0] for col in cursor.description]
+            cursor.arraysize = chunksize
+            while True:
+                rows = cursor.fetchmany(chunksize)
+                if not rows:
+                    break
+                yield pd.DataFrame(rows, columns=columns)
+        finally:
+            cursor.close()
+    
+    def _rechunk(self, batches: Iterator[pd.DataFrame], chunksize: int) -> Iterator[pd.DataFrame]:
+        """Re-slice server-sized DataFrame batches into frames of chunksize rows"""
+        pending = None
+        for batch in batches:
+            pending = batch if pending is None else pd.concat([pending, batch], ignore_index=True)
+            while len(pending) >= chunksize:
+                yield pending.iloc[:chunksize].reset_index(drop=True)
+                pending = pending.iloc[chunksize:]
+        if pending is not None and len(pending):
+            yield pending.reset_index(drop=True)
+    
     def execute_structured_query(self, structured_query: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute a structured query and return formatted results"""
+        """Execute a structured query and return formatted results, reusing a recent identical result"""
+        key = self._result_cache_key(structured_query)
+        cached = self._result_cache.get(key)
+        if cached and time.monotonic() - cached[0] < RESULT_CACHE_TTL:
+            self._result_cache.move_to_end(key)
+            result = copy.deepcopy(cached[1])
+            result['query_executed'] = structured_query
+            return result
+        
+        result = self._run_structured_query(structured_query)
+        if 'error' not in result:
+            self._result_cache[key] = (time.monotonic(), copy.deepcopy(result))
+            self._result_cache.move_to_end(key)
+            if len(self._result_cache) > RESULT_CACHE_SIZE:
+                self._result_cache.popitem(last=False)
+        return result
+    
+    def _result_cache_key(self, structured_query: Dict[str, Any]) -> str:
+        """Digest of the query's canonical JSON, so equal queries match whatever their key order"""
+        canonical = json.dumps(structured_query, sort_keys=True, default=str)
+        return hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
+    
+    def _run_structured_query(self, structured_query: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a structured query against the warehouse and format the results"""
         try:
             # Convert structured query to SQL
-            sql = self.build_sql_from_structured_query(structured_query)
+            sql, params = self.build_sql_from_structured_query(structured_query)
             
-            # Execute main query
-            df = self.execute_query(sql)
+            # Execute main query; the results go straight into dicts, so skip the DataFrame
+            started = time.perf_counter()
+            records = self._execute_query_records(sql, params)
+            elapsed = time.perf_counter() - started
             
             # Get sample data
             entity = structured_query.get('entity', 'data')
             table_name = self._get_table_name(entity)
-            sample_sql = f"SELECT * FROM {table_name} LIMIT 10"
-            sample_df = self.execute_query(sample_sql)
+            sample_rows = self._get_table_sample(table_name)
             
             # Format results
             result = {
                 "query_executed": structured_query,
-                "row_count": len(df),
-                "execution_time": "0.15s",  # Snowflake is typically slower than local
+                "row_count": len(records),
+                "execution_time": f"{elapsed:.3f}s",
                 "data": {
-                    "summary_stats": self._format_summary_stats(df, structured_query),
-                    "data_points": sample_df.to_dict('records'),
+                    "summary_stats": self._format_summary_stats(records[0] if records else None, structured_query),
+                    "data_points": sample_rows,
                     "period_label": self._get_period_label(structured_query.get('time_period', {}))
                 }
             }
             
             # Add aggregated data if grouping was requested
             if 'aggregations' in structured_query and len(structured_query['aggregations']) > 0:
-                result['data']['breakdowns'] = df.to_dict('records')
+                result['data']['breakdowns'] = records
             
             return result
             
@@ -120,48 +260,34 @@ class SnowflakeDataService(DataInterface):
                 "data": {}
             }
     
+    def _get_table_sample(self, table_name: str) -> List[Dict[str, Any]]:
+        """Get the first rows of a table, reused for METADATA_CACHE_TTL seconds to save a warehouse round trip"""
+        cached = self._table_samples.get(table_name)
+        if cached is None or time.monotonic() - cached[0] >= METADATA_CACHE_TTL:
+            records = self._execute_query_records(f"SELECT * FROM {table_name} LIMIT 10")
+            cached = self._table_samples[table_name] = (time.monotonic(), records)
+        # Callers get their own row dicts, so changing them can't alter the cache
+        return [dict(row) for row in cached[1]]
+    
     def _get_table_name(self, entity: str) -> str:
         """Map entity to table name"""
-        table_map = {
-            'loans': 'LOANS',
-            'loan': 'LOANS',
-            'deposits': 'DEPOSITS',
-            'deposit': 'DEPOSITS',
-            'customers': 'CUSTOMERS',
-            'customer': 'CUSTOMERS'
-        }
-        return table_map.get(entity.lower(), entity.upper())
+        return _TABLE_MAP.get(entity.lower(), entity).upper()
     
-    def _format_summary_stats(self, df: pd.DataFrame, query: Dict[str, Any]) -> Dict[str, Any]:
-        """Format summary statistics from query results"""
+    def _format_summary_stats(self, row: Optional[Dict[str, Any]], query: Dict[str, Any]) -> Dict[str, Any]:
+        """Format summary statistics from the first result row"""
         stats = {}
         
-        # Extract values from dataframe
-        if not df.empty:
-            row = df.iloc[0]
-            for col in df.columns:
-                col_lower = col.lower()
-                if col_lower in ['total_count', 'total_amount', 'average_amount', 'default_rate']:
-                    value = row[col]
-                    if pd.notna(value):
-                        stats[col_lower] = float(value) if isinstance(value, (int, float)) else value
+        # Extract values from the row; Snowflake returns upper-case column names
+        if row is not None:
+            for col, value in row.items():
+                name = col.lower()
+                if name not in _SUMMARY_COLUMNS:
+                    continue
+                if value is not None:
+                    stats[name] = float(value) if isinstance(value, (int, float)) else value
         
         # Add entity-specific stats
-        entity = query.get('entity', '').lower()
-        if entity in ['loan', 'loans'] and 'total_count' in stats:
-            stats['total_loans'] = stats.pop('total_count', 0)
-            stats['total_value'] = stats.get('total_amount', 0)
-            if 'average_amount' in stats:
-                stats['average_loan_size'] = stats.pop('average_amount')
-        elif entity in ['deposit', 'deposits'] and 'total_count' in stats:
-            stats['total_accounts'] = stats.pop('total_count', 0)
-            stats['total_deposits'] = stats.get('total_amount', 0)
-            if 'average_amount' in stats:
-                stats['average_balance'] = stats.pop('average_amount')
-        elif entity in ['customer', 'customers'] and 'total_count' in stats:
-            stats['total_customers'] = stats.pop('total_count', 0)
-        
-        return stats
+        return self._rename_summary_stats(stats, query.get('entity', ''))
     
     def _get_period_label(self, time_period: Dict[str, Any]) -> str:
         """Get a label for the time period"""
@@ -179,33 +305,41 @@ class SnowflakeDataService(DataInterface):
         if not self.connection:
             raise ConnectionError("Not connected to Snowflake")
         
-        query = f"""
+        cached = self._schema_cache.get(table_name)
+        if cached and time.monotonic() - cached[0] < METADATA_CACHE_TTL:
+            return copy.deepcopy(cached[1])
+        
+        query = """
         SELECT 
             COLUMN_NAME,
             DATA_TYPE,
             IS_NULLABLE,
             COLUMN_DEFAULT
         FROM INFORMATION_SCHEMA.COLUMNS
-        WHERE TABLE_NAME = '{table_name.upper()}'
-        AND TABLE_SCHEMA = '{self.connection_params['schema']}'
+        WHERE TABLE_NAME = %s
+        AND TABLE_SCHEMA = CURRENT_SCHEMA()
         ORDER BY ORDINAL_POSITION
         """
         
-        df = self.execute_query(query)
+        # Build the column list straight from the result tuples, without a DataFrame
+        with closing(self.connection.cursor()) as cursor:
+            cursor.execute(query, (table_name.upper(),))
+            rows = cursor.fetchall()
         
         schema = {
             "table_name": table_name,
-            "columns": []
+            "columns": [
+                {
+                    "name": name,
+                    "type": data_type,
+                    "nullable": is_nullable == 'YES',
+                    "default": default
+                }
+                for name, data_type, is_nullable, default in rows
+            ]
         }
         
-        for _, row in df.iterrows():
-            schema["columns"].append({
-                "name": row['COLUMN_NAME'],
-                "type": row['DATA_TYPE'],
-                "nullable": row['IS_NULLABLE'] == 'YES',
-                "default": row['COLUMN_DEFAULT']
-            })
-        
+        self._schema_cache[table_name] = (time.monotonic(), copy.deepcopy(schema))
         return schema
     
     def get_available_tables(self) -> List[str]:
@@ -213,16 +347,24 @@ class SnowflakeDataService(DataInterface):
         if not self.connection:
             raise ConnectionError("Not connected to Snowflake")
         
-        query = f"""
+        if self._tables_cache and time.monotonic() - self._tables_cache[0] < METADATA_CACHE_TTL:
+            return list(self._tables_cache[1])
+        
+        query = """
         SELECT TABLE_NAME
         FROM INFORMATION_SCHEMA.TABLES
-        WHERE TABLE_SCHEMA = '{self.connection_params['schema']}'
+        WHERE TABLE_SCHEMA = CURRENT_SCHEMA()
         AND TABLE_TYPE = 'BASE TABLE'
         ORDER BY TABLE_NAME
         """
         
-        df = self.execute_query(query)
-        return df['TABLE_NAME'].tolist()
+        # A single column of names needs no DataFrame
+        with closing(self.connection.cursor()) as cursor:
+            cursor.execute(query)
+            tables = [row[0] for row in cursor]
+        
+        self._tables_cache = (time.monotonic(), tables)
+        return list(tables)
     
     def validate_connection(self) -> bool:
         """Test if the connection is valid"""
@@ -230,37 +372,22 @@ class SnowflakeDataService(DataInterface):
             return False
         
         try:
-            cursor = self.connection.cursor()
-            cursor.execute("SELECT CURRENT_VERSION()")
-            cursor.fetchone()
-            cursor.close()
+            with closing(self.connection.cursor()) as cursor:
+                cursor.execute("SELECT CURRENT_VERSION()")
+                cursor.fetchone()
             return True
         except:
             return False
     
     def get_connection_info(self) -> Dict[str, Any]:
         """Get information about the connection"""
+        connected = self.validate_connection()
         return {
             "type": "Snowflake",
             "account": self.connection_params['account'],
             "database": self.connection_params['database'],
             "schema": self.connection_params['schema'],
             "warehouse": self.connection_params['warehouse'],
-            "connected": self.validate_connection(),
-            "tables": self.get_available_tables() if self.validate_connection() else []
+            "connected": connected,
+            "tables": self.get_available_tables() if connected else []
         }
-    
-    def build_sql_from_structured_query(self, query_dict: Dict[str, Any]) -> str:
-        """Override to handle Snowflake-specific SQL syntax"""
-        # Get base SQL from parent
-        sql = super().build_sql_from_structured_query(query_dict)
-        
-        # Snowflake uses uppercase table names
-        sql = sql.replace(' loans', ' LOANS')
-        sql = sql.replace(' deposits', ' DEPOSITS')
-        sql = sql.replace(' customers', ' CUSTOMERS')
-        sql = sql.replace('FROM loans', 'FROM LOANS')
-        sql = sql.replace('FROM deposits', 'FROM DEPOSITS')
-        sql = sql.replace('FROM customers', 'FROM CUSTOMERS')
-        
-        return sql
\ No newline at end of file
@@ -1,6 +1,8 @@
 from typing import List, Dict, Optional
 import json
+from contextlib import closing
 from .llm_interface import LLMInterface
+from .snowflake_connections import acquire_connection, release_connection
 
 try:
     import snowflake.connector
@@ -9,6 +11,21 @@ except ImportError:
     SNOWFLAKE_AVAILABLE = False
 
 
+# Chat role -> speaker label used in the Cortex prompt; other roles are left out
+ROLE_PREFIXES = {
+    'system': 'System: ',
+    'user': 'User: ',
+    'assistant': 'Assistant: '
+}
+
+# Cortex COMPLETE call; model, prompt and options are bound per request. OBJECT_CONSTRUCT
+# drops NULL values, so an unset max_tokens is left out of the options
+COMPLETE_SQL = (
+    "SELECT SNOWFLAKE.CORTEX.COMPLETE(%s, %s, "
+    "OBJECT_CONSTRUCT('temperature', %s, 'max_tokens', %s)) as response"
+)
+
+
 class SnowflakeService(LLMInterface):
     """Snowflake Cortex LLM implementation"""
     
@@ -19,6 +36,9 @@ class SnowflakeService(LLMInterface):
         'gemma-7b'
     ]
     
+    # Membership check for complete(), which runs on every LLM call
+    _AVAILABLE_MODELS_SET = frozenset(AVAILABLE_MODELS)
+    
     def __init__(
         self,
         account: str,
@@ -45,9 +65,12 @@ class SnowflakeService(LLMInterface):
         self._connection = None
     
     def _get_connection(self):
-        """Get or create a Snowflake connection"""
+        """Get or create a Snowflake connection, shared with a data service on the same account"""
         if self._connection is None or self._connection.is_closed():
-            self._connection = snowflake.connector.connect(**self.connection_params)
+            if self._connection is not None:
+                release_connection(self.connection_params)
+                self._connection = None
+            self._connection = acquire_connection(self.connection_params)
         return self._connection
     
     def complete(
@@ -61,30 +84,17 @@ class SnowflakeService(LLMInterface):
         if model is None:
             model = 'llama2-70b-chat'
         
-        if model not in self.AVAILABLE_MODELS:
+        if model not in self._AVAILABLE_MODELS_SET:
             raise ValueError(f"Model {model} not available. Choose from: {self.AVAILABLE_MODELS}")
         
         # Convert messages to prompt format
         prompt = self._format_messages(messages)
         
-        # Build the SQL query with COMPLETE function
-        query = f"""
-        SELECT SNOWFLAKE.CORTEX.COMPLETE(
-            '{model}',
-            '{prompt.replace("'", "''")}',
-            {{
-                'temperature': {temperature}
-                {f", 'max_tokens': {max_tokens}" if max_tokens else ""}
-            }}
-        ) as response
-        """
-        
         try:
             conn = self._get_connection()
-            cursor = conn.cursor()
-            cursor.execute(query)
-            result = cursor.fetchone()
-            cursor.close()
+            with closing(conn.cursor()) as cursor:
+                cursor.execute(COMPLETE_SQL, (model, prompt, temperature, max_tokens or None))
+                result = cursor.fetchone()
             
             if result and result[0]:
                 return result[0]
@@ -96,17 +106,11 @@ class SnowflakeService(LLMInterface):
     
     def _format_messages(self, messages: List[Dict[str, str]]) -> str:
         """Format messages for Snowflake Cortex prompt"""
-        formatted_messages = []
-        for msg in messages:
-            role = msg['role']
-            content = msg['content']
-            
-            if role == 'system':
-                formatted_messages.append(f"System: {content}")
-            elif role == 'user':
-                formatted_messages.append(f"User: {content}")
-            elif role == 'assistant':
-                formatted_messages.append(f"Assistant: {content}")
+        formatted_messages = [
+            ROLE_PREFIXES[msg['role']] + msg['content']
+            for msg in messages
+            if msg['role'] in ROLE_PREFIXES
+        ]
         
         # Add prompt for assistant response
         formatted_messages.append("Assistant:")
@@ -121,15 +125,14 @@ class SnowflakeService(LLMInterface):
         """Test Snowflake connection"""
         try:
             conn = self._get_connection()
-            cursor = conn.cursor()
-            cursor.execute("SELECT CURRENT_VERSION()")
-            cursor.fetchone()
-            cursor.close()
+            with closing(conn.cursor()) as cursor:
+                cursor.execute("SELECT CURRENT_VERSION()")
+                cursor.fetchone()
             return True
         except Exception:
             return False
     
     def __del__(self):
-        """Close connection on cleanup"""
-        if self._connection and not self._connection.is_closed():
-            self._connection.close()
\ No newline at end of file
+        """Release the shared connection on cleanup"""
+        if getattr(self, '_connection', None) is not None:
+            release_connection(self.connection_params)
\ No newline at end of file
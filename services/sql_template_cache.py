@@ -0,0 +1,55 @@
+from functools import lru_cache
+from typing import Tuple
+
+# Shape of a structured query: (table name, metrics, filter keys, aggregations, has date range,
+# bind placeholder). Queries that differ only in their filter values or dates share a signature.
+QuerySignature = Tuple[str, Tuple[str, ...], Tuple[str, ...], Tuple[str, ...], bool, str]
+
+# Metric name -> SELECT fragment, for metrics that apply to any table
+_METRIC_FRAGMENTS = {
+    'count': "COUNT(*) as total_count",
+    'sum': "SUM(amount) as total_amount",
+    'average': "AVG(amount) as average_amount"
+}
+
+# Loans-only metric
+_DEFAULT_RATE_SQL = "SUM(CASE WHEN status = 'default' THEN 1 ELSE 0 END) * 100.0 / COUNT(*) as default_rate"
+
+
+@lru_cache(maxsize=1024)
+def build_sql_template(signature: QuerySignature) -> str:
+    """Build the SQL for a structured-query shape, with placeholders for filter and date values"""
+    table_name, metrics, filter_keys, aggregations, has_date_range, placeholder = signature
+    table = table_name.lower()
+    
+    # Build SELECT clause
+    select_parts = []
+    for metric in metrics:
+        fragment = _METRIC_FRAGMENTS.get(metric)
+        if fragment:
+            select_parts.append(fragment)
+        elif metric == 'default_rate' and table == 'loans':
+            select_parts.append(_DEFAULT_RATE_SQL)
+    
+    # Build WHERE clause
+    where_parts = [f"{key} = {placeholder}" for key in filter_keys]
+    if has_date_range:
+        where_parts.append(f"date >= {placeholder} AND date <= {placeholder}")
+    
+    # Build GROUP BY clause
+    group_by_parts = []
+    if 'by_category' in aggregations and table == 'loans':
+        group_by_parts.append('loan_type')
+        select_parts.insert(0, 'loan_type')
+    elif 'by_type' in aggregations and table == 'deposits':
+        group_by_parts.append('account_type')
+        select_parts.insert(0, 'account_type')
+    
+    # Construct SQL from fragments, joined once
+    sql_parts = ["SELECT ", ", ".join(select_parts), " FROM ", table_name]
+    if where_parts:
+        sql_parts.extend((" WHERE ", " AND ".join(where_parts)))
+    if group_by_parts:
+        sql_parts.extend((" GROUP BY ", ", ".join(group_by_parts)))
+    
+    return "".join(sql_parts)
@@ -3,8 +3,11 @@
 
 import os
 import sys
+import traceback
+from concurrent.futures import ThreadPoolExecutor
 from config.settings import Settings
 from services.openai_service import OpenAIService
+from services.data_factory import DataServiceFactory
 from agents.agent_registry import agent_registry
 
 # Test queries for each agent
@@ -31,31 +34,29 @@ test_queries = {
     ]
 }
 
-def test_agent(agent_name, queries):
-    """Test a specific agent with given queries"""
-    print(f"\n{'='*60}")
-    print(f"Testing {agent_name}")
-    print('='*60)
+def run_agent(agent_name, queries):
+    """Run a specific agent with given queries and return its report as text"""
+    lines = [f"\n{'='*60}", f"Testing {agent_name}", '='*60]
     
     # Get agent
     agent = agent_registry.create_agent(agent_name)
     if not agent:
-        print(f"ERROR: Could not create agent {agent_name}")
-        return
+        lines.append(f"ERROR: Could not create agent {agent_name}")
+        return "\n".join(lines)
     
     # Initialize LLM service
     settings = Settings()
     if not settings.is_openai_configured():
-        print("ERROR: OpenAI API key not configured")
-        return
+        lines.append("ERROR: OpenAI API key not configured")
+        return "\n".join(lines)
     
     llm_service = OpenAIService(api_key=settings.OPENAI_API_KEY)
     model = settings.OPENAI_MODEL or "gpt-4o-mini"
     
     # Test each query
     for query in queries[:1]:  # Test just first query for brevity
-        print(f"\nQuery: {query}")
-        print("-" * 40)
+        lines.append(f"\nQuery: {query}")
+        lines.append("-" * 40)
         
         try:
             # Process query
@@ -65,36 +66,46 @@ def test_agent(agent_name, queries):
                 model=model
             )
             
-            # Print results
+            # Record results
             if "error" in response:
-                print(f"ERROR: {response['error']}")
+                lines.append(f"ERROR: {response['error']}")
                 if "error_traceback" in response:
-                    print(f"Traceback: {response['error_traceback']}")
+                    lines.append(f"Traceback: {response['error_traceback']}")
             else:
-                print(f"Response: {response.get('response', 'No response text')}")
+                lines.append(f"Response: {response.get('response', 'No response text')}")
                 
                 # Show execution details
                 if "execution_results" in response:
                     exec_results = response["execution_results"]
-                    print(f"\nExecution Summary:")
-                    print(f"- Success: {exec_results.get('success', False)}")
-                    print(f"- Steps executed: {len(exec_results.get('steps_executed', []))}")
+                    lines.append(f"\nExecution Summary:")
+                    lines.append(f"- Success: {exec_results.get('success', False)}")
+                    lines.append(f"- Steps executed: {len(exec_results.get('steps_executed', []))}")
                     if exec_results.get('errors'):
-                        print(f"- Errors: {exec_results['errors']}")
+                        lines.append(f"- Errors: {exec_results['errors']}")
                         
         except Exception as e:
-            print(f"EXCEPTION: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            lines.append(f"EXCEPTION: {str(e)}")
+            lines.append(traceback.format_exc())
+    
+    return "\n".join(lines)
+
+def test_agent(agent_name, queries):
+    """Test a specific agent with given queries"""
+    print(run_agent(agent_name, queries))
 
 def main():
     """Run tests for all agents"""
     print("Testing New Banking Agents with Real Data")
     print("="*60)
     
-    # Test each agent
-    for agent_name, queries in test_queries.items():
-        test_agent(agent_name, queries)
+    # Agents share one data service; connect it here rather than racing to connect from each thread
+    DataServiceFactory.create_data_service().connect()
+    
+    # Test each agent; they mostly wait on the LLM, so run them side by side and
+    # print the reports in order so they don't interleave
+    with ThreadPoolExecutor(max_workers=len(test_queries)) as executor:
+        for report in executor.map(lambda item: run_agent(*item), test_queries.items()):
+            print(report)
     
     print("\n" + "="*60)
     print("Testing Complete!")
@@ -4,6 +4,7 @@
 import os
 import sys
 import json
+import traceback
 from config.settings import Settings
 from services.openai_service import OpenAIService
 from agents.agent_registry import agent_registry
@@ -62,7 +63,6 @@ def test_analysis_query():
         
     except Exception as e:
         print(f"\nEXCEPTION: {str(e)}")
-        import traceback
         traceback.print_exc()
 
 if __name__ == "__main__":
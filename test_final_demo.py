@@ -3,28 +3,27 @@
 
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from config.settings import Settings
 from services.openai_service import OpenAIService
+from services.data_factory import DataServiceFactory
 from agents.agent_registry import agent_registry
 
-def test_agent(agent_name, query):
-    """Test a specific agent with a query"""
-    print(f"\n{'='*70}")
-    print(f"Agent: {agent_name}")
-    print(f"Query: {query}")
-    print('='*70)
+def run_agent(agent_name, query):
+    """Run a specific agent with a query and return its report as text"""
+    lines = [f"\n{'='*70}", f"Agent: {agent_name}", f"Query: {query}", '='*70]
     
     # Get agent
     agent = agent_registry.create_agent(agent_name)
     if not agent:
-        print(f"ERROR: Could not create {agent_name}")
-        return
+        lines.append(f"ERROR: Could not create {agent_name}")
+        return "\n".join(lines)
     
     # Initialize LLM service
     settings = Settings()
     if not settings.is_openai_configured():
-        print("ERROR: OpenAI API key not configured")
-        return
+        lines.append("ERROR: OpenAI API key not configured")
+        return "\n".join(lines)
     
     llm_service = OpenAIService(api_key=settings.OPENAI_API_KEY)
     model = settings.OPENAI_MODEL or "gpt-4o-mini"
@@ -37,19 +36,25 @@ def test_agent(agent_name, query):
             model=model
         )
         
-        # Print response
-        print("\nResponse:")
-        print(response.get('response', 'No response'))
+        # Record response
+        lines.append("\nResponse:")
+        lines.append(str(response.get('response', 'No response')))
         
         # Show basic metrics if available
         if 'data' in response and isinstance(response['data'], dict):
             if 'summary' in response['data']:
-                print("\nData Summary:")
+                lines.append("\nData Summary:")
                 for key, value in list(response['data']['summary'].items())[:3]:
-                    print(f"  {key}: {value}")
+                    lines.append(f"  {key}: {value}")
         
     except Exception as e:
-        print(f"\nERROR: {str(e)}")
+        lines.append(f"\nERROR: {str(e)}")
+    
+    return "\n".join(lines)
+
+def test_agent(agent_name, query):
+    """Test a specific agent with a query"""
+    print(run_agent(agent_name, query))
 
 def main():
     """Run demo tests for all agents"""
@@ -63,8 +68,14 @@ def main():
         ("TransactionInsightsAgent", "Show transaction volume trends")
     ]
     
-    for agent_name, query in test_cases:
-        test_agent(agent_name, query)
+    # Agents share one data service; connect it here rather than racing to connect from each thread
+    DataServiceFactory.create_data_service().connect()
+    
+    # Each agent spends most of its time waiting on the LLM, so run them side by side;
+    # reports are printed in test-case order so they don't interleave
+    with ThreadPoolExecutor(max_workers=len(test_cases)) as executor:
+        for report in executor.map(lambda case: run_agent(*case), test_cases):
+            print(report)
     
     print(f"\n{'='*70}")
     print("Demo Complete!")
@@ -4,6 +4,7 @@
 import os
 import sys
 import json
+import traceback
 from config.settings import Settings
 from services.openai_service import OpenAIService
 from agents.agent_registry import agent_registry
@@ -47,7 +48,8 @@ def test_segmentation_detailed():
         response = agent.process(
             query=query,
             llm_service=llm_service,
-            model=model
+            model=model,
+            plan=plan
         )
         
         # Check execution results
@@ -67,7 +69,6 @@ def test_segmentation_detailed():
         
     except Exception as e:
         print(f"\nEXCEPTION: {str(e)}")
-        import traceback
         traceback.print_exc()
 
 if __name__ == "__main__":
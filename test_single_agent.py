@@ -4,63 +4,80 @@
 import os
 import sys
 import json
+import traceback
+from concurrent.futures import ThreadPoolExecutor
 from config.settings import Settings
 from services.openai_service import OpenAIService
 from agents.agent_registry import agent_registry
 
-def test_loan_agent():
-    """Test the loan agent specifically"""
-    print("Testing LoanPortfolioAgent")
-    print("="*60)
+def run_loan_agent():
+    """Run the loan agent and return its report as text"""
+    lines = []
     
-    # Get agent
-    agent = agent_registry.create_agent("LoanPortfolioAgent")
-    if not agent:
-        print("ERROR: Could not create LoanPortfolioAgent")
-        return
+    lines.append("Testing LoanPortfolioAgent")
+    lines.append("="*60)
     
-    # Initialize LLM service
+    # Initialize LLM service and open its API connection in the background
+    # while the agent is built, so the handshake is off the critical path
     settings = Settings()
-    if not settings.is_openai_configured():
-        print("ERROR: OpenAI API key not configured")
-        return
+    llm_service = None
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        if settings.is_openai_configured():
+            llm_service = OpenAIService(api_key=settings.OPENAI_API_KEY, cache=True)
+            pool.submit(llm_service.validate_connection)
+        
+        # Get agent
+        agent = agent_registry.create_agent("LoanPortfolioAgent")
+    
+    if not agent:
+        lines.append("ERROR: Could not create LoanPortfolioAgent")
+        return "\n".join(lines)
+    
+    if llm_service is None:
+        lines.append("ERROR: OpenAI API key not configured")
+        return "\n".join(lines)
     
-    llm_service = OpenAIService(api_key=settings.OPENAI_API_KEY)
     model = settings.OPENAI_MODEL or "gpt-4o-mini"
     
     query = "How are my loans performing?"
     
     # First, create the plan
-    print(f"\nQuery: {query}")
-    print("-" * 40)
-    print("\nCreating plan...")
+    lines.append(f"\nQuery: {query}")
+    lines.append("-" * 40)
+    lines.append("\nCreating plan...")
     
     plan = agent.create_plan(query, llm_service, model)
-    print("\nGenerated Plan:")
-    print(json.dumps(plan, indent=2))
+    lines.append("\nGenerated Plan:")
+    lines.append(json.dumps(plan, indent=2))
     
     # Now process the query
-    print("\nProcessing query...")
+    lines.append("\nProcessing query...")
     
     try:
         response = agent.process(
             query=query,
             llm_service=llm_service,
-            model=model
+            model=model,
+            plan=plan
         )
         
         # Print results
         if "error" in response:
-            print(f"\nERROR: {response['error']}")
+            lines.append(f"\nERROR: {response['error']}")
             if "error_traceback" in response:
-                print(f"Traceback: {response['error_traceback']}")
+                lines.append(f"Traceback: {response['error_traceback']}")
         else:
-            print(f"\nResponse: {response.get('response', 'No response text')}")
+            lines.append(f"\nResponse: {response.get('response', 'No response text')}")
             
     except Exception as e:
-        print(f"\nEXCEPTION: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        lines.append(f"\nEXCEPTION: {str(e)}")
+        lines.append(traceback.format_exc())
+    
+    return "\n".join(lines)
+
+def test_loan_agent():
+    """Test the loan agent specifically"""
+    print(run_loan_agent())
 
 if __name__ == "__main__":
     test_loan_agent()
\ No newline at end of file
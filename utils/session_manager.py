@@ -10,9 +10,14 @@ class SessionManager:
     
     def __init__(self):
         self._initialize_state()
+        # Plain reference to the sessions dict, skipping the session_state proxy on each access
+        self._sessions: Dict[str, ChatSession] = st.session_state.chat_sessions
+        # Current session resolved once per script run; the manager is recreated on every rerun
+        self._current_session: Optional[ChatSession] = None
     
     def _initialize_state(self):
         """Initialize session state variables"""
+        # Kept in order of last update (oldest first); every update goes through this class
         if 'chat_sessions' not in st.session_state:
             st.session_state.chat_sessions = {}
         
@@ -29,37 +34,44 @@ class SessionManager:
     def create_session(self, name: str = "New Session") -> ChatSession:
         """Create a new chat session"""
         session = ChatSession(name=name)
-        st.session_state.chat_sessions[session.id] = session
+        self._sessions[session.id] = session
         return session
     
     def get_session(self, session_id: str) -> Optional[ChatSession]:
         """Get chat session by ID"""
-        return st.session_state.chat_sessions.get(session_id)
+        return self._sessions.get(session_id)
     
     def get_all_sessions(self) -> List[ChatSession]:
         """Get all chat sessions sorted by updated time (newest first)"""
-        sessions = list(st.session_state.chat_sessions.values())
-        return sorted(sessions, key=lambda s: s.updated_at, reverse=True)
+        # The dict is already in update order, so no sort is needed on each rerun
+        return list(reversed(self._sessions.values()))
+    
+    def _mark_updated(self, session: ChatSession):
+        """Move a session that was just updated to the newest end of the ordering"""
+        self._sessions[session.id] = self._sessions.pop(session.id)
     
     def delete_session(self, session_id: str):
         """Delete a chat session"""
-        if session_id in st.session_state.chat_sessions:
-            del st.session_state.chat_sessions[session_id]
-            
-            # Reset current session if it was deleted
-            if st.session_state.current_session_id == session_id:
-                st.session_state.current_session_id = None
+        if self._sessions.pop(session_id, None) is None:
+            return
+        
+        # Reset current session if it was deleted
+        if st.session_state.current_session_id == session_id:
+            st.session_state.current_session_id = None
+            self._current_session = None
     
     def set_current_session(self, session_id: str):
         """Set the current active chat session"""
-        if session_id in st.session_state.chat_sessions:
+        session = self._sessions.get(session_id)
+        if session is not None:
             st.session_state.current_session_id = session_id
+            self._current_session = session
     
     def get_current_session(self) -> Optional[ChatSession]:
         """Get the current active chat session"""
-        if st.session_state.current_session_id:
-            return self.get_session(st.session_state.current_session_id)
-        return None
+        if self._current_session is None and st.session_state.current_session_id:
+            self._current_session = self.get_session(st.session_state.current_session_id)
+        return self._current_session
     
     def rename_session(self, session_id: str, new_name: str):
         """Rename a chat session"""
@@ -67,7 +79,9 @@ class SessionManager:
         if session:
             session.name = new_name
             session.auto_renamed = True
+            session.needs_auto_rename = False
             session.updated_at = datetime.now()
+            self._mark_updated(session)
     
     # LLM Provider Management
     def set_llm_provider(self, provider: str):
@@ -98,6 +112,7 @@ class SessionManager:
         session = self.get_current_session()
         if session:
             session.add_message(role, content, model_used, provider)
+            self._mark_updated(session)
     
     def get_current_messages(self) -> List[Dict[str, str]]:
         """Get messages from current session formatted for API"""
@@ -111,10 +126,11 @@ class SessionManager:
         session = self.get_current_session()
         if session:
             session.clear_messages()
+            self._mark_updated(session)
     
     def should_auto_rename_session(self, session_id: str) -> bool:
         """Check if a session should be auto-renamed (has messages but not renamed yet)"""
         session = self.get_session(session_id)
         if session:
-            return len(session.messages) > 0 and not session.auto_renamed and session.name == "New Session"
+            return session.needs_auto_rename
         return False
\ No newline at end of file